@@ -2,14 +2,16 @@
 A tool to help manage versions (usually in a VFX context).
 """
 
-import contextlib
+import fnmatch
+import functools
 import re
-import glob
 import logging
 import sys
 import os
 import platform
-from pathlib import Path
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, Queue
 
 
 logger = logging.getLogger(__name__)
@@ -30,9 +32,15 @@ VERSION_SCAN_REGEX = re.compile(
     r"([vV]{1}[0-9]+)(?![^\\/]+[\\/]+)(?![^\\/]+[vV]{1}\d+)"
 )
 
+# Regex to check that a string is nothing but a single version token
+VERSION_TOKEN_REGEX = re.compile(r"[vV][0-9]+")
+
 # Regex to pull out the frame range from resolve's file names
 FRAME_SEQUENCE_REGEX = re.compile(r"(\[[0-9-]+\])")
 
+# Regex to match the file name (last part) of a path
+TRAILING_FILENAME_REGEX = re.compile(r"([^\\\/]+)$")
+
 
 
 # Stolen from python_get_resolve.py in the examples folder.
@@ -66,13 +74,209 @@ UI = FUSION.UIManager
 DISPATCHER = DVR.UIDispatcher(UI)
 
 
+# Results of Shot.availableVersions, keyed by (glob, duration),
+# so every cut of the same footage only searches the disk once per scan.
+_versions_cache = {}
+
+# Folders we've found to be empty or missing this scan,
+# so we can skip straight past them without doing any matching.
+_empty_dirs = set()
+
+# The names of the subfolders in each folder we've listed this scan,
+# so globbing doesn't need to stat every match to see if it's a directory.
+_subdirectories = {}
+
+
+@functools.lru_cache(maxsize=None)
+def list_directory(directory):
+    """List the names in a directory.
+    Cached, so each folder is only read from disk once per scan."""
+    names = []
+    subdirectories = set()
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                names.append(entry.name)
+                # scandir usually knows this already, without another trip to disk
+                if entry.is_dir():
+                    subdirectories.add(entry.name)
+    except OSError:
+        names = []
+
+    names = tuple(names)
+    _subdirectories[directory] = subdirectories
+
+    if not names:
+        _empty_dirs.add(directory)
+    return names
+
+
+@functools.lru_cache(maxsize=None)
+def list_directory_text(directory):
+    """The names in a directory as one newline separated string, for regex matching.
+    Cached, as sibling versions often share a folder and would otherwise rejoin it."""
+    return "\n".join(list_directory(directory))
+
+
+def is_directory(path):
+    """os.path.isdir, answered from the parent folder's listing if we've read it."""
+    parent, name = os.path.split(path)
+    subdirectories = _subdirectories.get(parent or os.curdir)
+    if subdirectories is None:
+        return os.path.isdir(path)
+    return name in subdirectories
+
+
+def has_wildcards(pattern):
+    return any(char in pattern for char in "*?[")
+
+
+@functools.lru_cache(maxsize=4096)
+def glob_cached(pattern):
+    """Stand in for glob.glob that reads folders through list_directory,
+    so each folder is only listed once per scan however many patterns search it.
+    Results are sorted, and cached until the next scan."""
+    if not has_wildcards(pattern):
+        return (pattern,) if os.path.lexists(pattern) else ()
+
+    directory, leaf = os.path.split(pattern)
+    if not leaf:
+        # A trailing separator means we only want directories
+        return tuple(
+            os.path.join(i, "") for i in glob_cached(directory) if is_directory(i)
+        )
+
+    if has_wildcards(directory):
+        directories = [i for i in glob_cached(directory) if is_directory(i)]
+    else:
+        directories = [directory]
+
+    matches = []
+    for folder in directories:
+        if folder in _empty_dirs:
+            continue
+        names = fnmatch.filter(list_directory(folder or os.curdir), leaf)
+        # Like glob, wildcards don't match hidden files
+        if not leaf.startswith("."):
+            names = [i for i in names if not i.startswith(".")]
+        matches += [os.path.join(folder, i) for i in names]
+    return tuple(sorted(matches))
+
+
+def last_match(pattern, string):
+    """The first group of the last match of a regex in a string, or None.
+    Walks the matches instead of building a list of them with findall."""
+    match = None
+    for match in pattern.finditer(string):
+        pass
+    return match.group(1) if match else None
+
+
+def extract_version(path, globParts):
+    """Pull the version token out of a path found by globbing.
+    With a single wildcard the version is whatever the wildcard matched,
+    so slice it out directly and only fall back to the regex otherwise."""
+    if len(globParts) == 2:
+        prefix, suffix = globParts
+        version = path[len(prefix) : len(path) - len(suffix)]
+        if VERSION_TOKEN_REGEX.fullmatch(version):
+            return version
+    return last_match(VERSION_SCAN_REGEX, path)
+
+
+@functools.lru_cache(maxsize=256)
+def list_versions(globPath):
+    """Find every version on disk matching a glob with * in place of the version.
+    Cached, as shots cut from the same renders all search for the same pattern.
+    Cleared at the start of every scan."""
+    globParts = globPath.split("*")
+    versions = {extract_version(i, globParts) for i in glob_cached(globPath)}
+    versions.discard(None)
+    return tuple(sorted(versions))
+
+
+def clear_scan_caches():
+    """Forget everything we've read from disk, so a new scan picks up new renders."""
+    list_directory.cache_clear()
+    list_directory_text.cache_clear()
+    _empty_dirs.clear()
+    _subdirectories.clear()
+    glob_cached.cache_clear()
+    list_versions.cache_clear()
+    _versions_cache.clear()
+
+
+class MediaPoolIndex:
+    """Every clip in the media pool, indexed by file path (and optionally by bin).
+    Walking the media pool takes a call into Resolve for every folder and clip,
+    so walk it once and look clips up here instead of searching it per shot."""
+
+    def __init__(self, mediaPool, indexFolders=True):
+        self.mediaPool = mediaPool
+        self.indexFolders = indexFolders
+        self.rebuild()
+
+    def rebuild(self):
+        """Walk the whole media pool, breadth first, and index every clip."""
+        self.clips = {}  # file path -> MediaPoolItem
+        self.folders = {}  # media id -> Folder
+
+        queue = deque([self.mediaPool.GetRootFolder()])
+        while queue:
+            folder = queue.popleft()
+            for clip in folder.GetClipList():
+                path = clip.GetClipProperty("File Path")
+                if path:
+                    self.clips[path] = clip
+                if self.indexFolders:
+                    self.folders[clip.GetMediaId()] = folder
+            queue.extend(folder.GetSubFolderList())
+
+    def add(self, items):
+        """Index newly imported clips without walking the whole pool again."""
+        for item in items or []:
+            self.clips[item.GetClipProperty("File Path")] = item
+
+    def findClip(self, path):
+        """Find a clip by its file path.
+        Sequences are looked up by their folder, so fall back to
+        matching any clip that lives under the given path."""
+        item = self.clips.get(path)
+        if item:
+            return item
+
+        matches = [i for clipPath, i in self.clips.items() if path in clipPath]
+        if len(matches) > 0:
+            return matches[-1]
+
+        return False
+
+    def findFolder(self, item):
+        """Find the bin a clip lives in."""
+        return self.folders.get(item.GetMediaId(), False)
+
+
 class VersionUpShotsWindow:
     winID = "com.austinwitherspoon.resolve.VersionUpShots"
     _scanning = False
+    _updating = False
+
+    # How often to check on the background scan, in milliseconds
+    scanPollInterval = 50
+    # How many shots to search the disk for at once.
+    # The work is almost entirely waiting on the filesystem, so threads overlap well.
+    scanWorkers = 8
 
     def __init__(self):
         self.shots = []  # type: list[Shot]
         self.project = PROJECT
+        self._scanResults = Queue()
+        self._scanFutures = []
+        self._failedShots = []
+        self._duplicateShots = {}
+        self._videoTracks = {}
+        self._rows = []
+        self._toUpdate = deque()
 
         self.create_ui()
         self.build_shot_list()
@@ -160,49 +364,131 @@ class VersionUpShotsWindow:
             ]
         )
 
+        # Polls for results while shots are scanned in the background
+        self.scanTimer = UI.Timer(
+            {"ID": self.winID + "ScanTimer", "Interval": self.scanPollInterval}
+        )
+
+        # Updates one shot per tick, so the window keeps drawing between shots
+        self.updateTimer = UI.Timer({"ID": self.winID + "UpdateTimer", "Interval": 1})
+
         # Register Events
         self.window.On[self.winID].Close = self.closeEvent
+        DISPATCHER.On[self.winID + "ScanTimer"].Timeout = self.poll_scan
+        DISPATCHER.On[self.winID + "UpdateTimer"].Timeout = self.update_next_shot
         self.window.On["ScanVersions"].Clicked = self.scan_versions
         self.window.On["Submit"].Clicked = self.version_up_shots
         self.window.On["method"].CurrentTextChanged = self.method_changed
 
     def version_up_shots(self, event):
         """Swap out all versions with the highest available version."""
-        if self._scanning:
+        if self._scanning or self._updating:
             return
 
         if not self.shots:
             return
 
-        tree = self.window.Find("ShotTree")
-
         importToSourceBin = (
             self.window.Find("Location").CurrentText == "Same Bin As Original Clip"
         )
 
-        i = 0
-        for shot in self.shots:
-            success = shot.update(importToSourceBin, self.swap_source)
-            row = tree.TopLevelItem(i)
+        self._updating = True
+
+        # Index the media pool once up front, rather than having every shot
+        # walk the whole thing looking for its new clip.
+        self._swapSource = self.swap_source
+        self._mediaPoolIndex = None
+        if not self._swapSource:
+            self.window.Find("Status").SetText("Importing new versions..")
+            self._mediaPoolIndex = MediaPoolIndex(
+                self.project.GetMediaPool(), indexFolders=importToSourceBin
+            )
+            self.import_new_versions(importToSourceBin, self._mediaPoolIndex)
+
+        self._toUpdate = deque(
+            (shot, row)
+            for shot, row in zip(self.shots, self._rows)
+            if shot.isVersionable and not shot.scanFailed
+        )
+        self._updateTotal = len(self._toUpdate)
+        self.updateTimer.Start()
+
+    def update_next_shot(self, event):
+        """Update a single shot, then hand control back to the UI until the next tick."""
+        if self._toUpdate:
+            shot, row = self._toUpdate.popleft()
+            done = self._updateTotal - len(self._toUpdate)
+            self.window.Find("Status").SetText(
+                f"Updating {shot.name} ({done}/{self._updateTotal})"
+            )
+
+            success = shot.update(self._swapSource, self._mediaPoolIndex)
             if success:
                 row.Text[1] = shot.highestVersion
             else:
-                row.Text[0] = "!! FAILED !! " + row.Text[0]
-            i += 1
+                row.Text[0] = "!! FAILED !! " + shot.name
+
+        if not self._toUpdate:
+            self.updateTimer.Stop()
+            self.window.Find("Status").SetText("")
+            self._updating = False
+
+    def import_new_versions(self, importToSourceBin, mediaPoolIndex):
+        """Import the highest version of every shot into the media pool.
+        Everything going into the same bin is imported in a single call."""
+        mediaPool = self.project.GetMediaPool()
+        ms = RESOLVE.GetMediaStorage()
+
+        # id(bin) -> (bin, paths to import). None is whichever bin is open,
+        # and goes first so we import there before switching bins.
+        bins = {id(None): (None, [])}
+        for shot in self.shots:
+            if shot.currentVersion == shot.highestVersion:
+                continue
+
+            folder = None
+            if importToSourceBin:
+                folder = mediaPoolIndex.findFolder(shot.mpItem) or None
+            paths = bins.setdefault(id(folder), (folder, []))[1]
+
+            newPath = shot.newVersionPath()
+            if newPath not in paths:
+                paths.append(newPath)
+
+        imported = []
+        for folder, paths in bins.values():
+            if not paths:
+                continue
+            if folder:
+                mediaPool.SetCurrentFolder(folder)
+            mediaPoolIndex.add(ms.AddItemListToMediaPool(paths))
+            imported += paths
+
+        # Resolve didn't hand back all of the new clips, so the index is stale
+        if not all(mediaPoolIndex.findClip(i) for i in imported):
+            mediaPoolIndex.rebuild()
 
     def populate_track_list(self):
         dropdown = self.window.Find("Track")
         timeline = self.project.GetCurrentTimeline()
 
-        videoTracks = [
-            timeline.GetTrackName("video", i + 1)
-            for i in range(timeline.GetTrackCount("video"))
-        ]
+        videoTracks = [name for _, name in self._video_tracks(timeline)]
         videoTracks.append("All Tracks")
         videoTracks.reverse()
 
         dropdown.AddItems(videoTracks)
 
+    def _video_tracks(self, timeline):
+        """List the (index, name) of every video track on a timeline.
+        Each name is a separate call into Resolve, so only ask once per scan."""
+        key = timeline.GetName()
+        if key not in self._videoTracks:
+            self._videoTracks[key] = [
+                (i + 1, timeline.GetTrackName("video", i + 1))
+                for i in range(timeline.GetTrackCount("video"))
+            ]
+        return self._videoTracks[key]
+
     @property
     def swap_source(self):
         """Checks if the user has selected the option to swap source footage, rather than timeline items"""
@@ -210,7 +496,7 @@ class VersionUpShotsWindow:
 
     def method_changed(self, event):
         selection = event["Text"]
-        logger.debug(f"Method changed to '{selection}'")
+        logger.debug("Method changed to '%s'", selection)
         import_location_label = self.window.Find("LocationLabel")
         import_location_dropdown = self.window.Find("Location")
         if self.swap_source:
@@ -221,62 +507,141 @@ class VersionUpShotsWindow:
             import_location_dropdown.Show()
 
     def scan_versions(self, event):
-        if self._scanning:
+        if self._scanning or self._updating:
             return
 
         logger.info("Scanning Versions..")
 
         self._scanning = True
+        clear_scan_caches()
+        # Tracks may have been added or renamed since the last scan
+        self._videoTracks.clear()
 
         self.window.Find("Status").SetText("Scanning versions..")
 
         timeline = self.project.GetCurrentTimeline()
-        logger.debug(f"Timeline: {timeline.GetName()}")
+        logger.debug("Timeline: %s", timeline.GetName())
 
         targetTrack = self.window.Find("Track").CurrentText
-        logger.debug(f"Target Track: {targetTrack}")
+        logger.debug("Target Track: %s", targetTrack)
 
         # Grab all clips in selected track
         clips = []
         if targetTrack == "All Tracks":
             logger.info("Scanning all tracks..")
-            for track in [
-                (i + 1, timeline.GetTrackName("video", i + 1))
-                for i in range(timeline.GetTrackCount("video"))
-            ]:
-                index, name = track
-                logger.info(f"Scanning track {index} ({name})")
+            for index, name in self._video_tracks(timeline):
+                logger.info("Scanning track %s (%s)", index, name)
                 found = timeline.GetItemListInTrack("video", index)
-                logger.info(f"Found {len(found)} clips")
+                logger.info("Found %s clips", len(found))
                 clips += found
 
         else:
-            for track in [
-                (i + 1, timeline.GetTrackName("video", i + 1))
-                for i in range(timeline.GetTrackCount("video"))
-            ]:
-                index, name = track
+            for index, name in self._video_tracks(timeline):
                 if name == targetTrack:
-                    logger.info(f"Scanning track {index} ({name})")
+                    logger.info("Scanning track %s (%s)", index, name)
                     clips += timeline.GetItemListInTrack("video", index)
-                    logger.info(f"Found {len(clips)} clips")
                     break
+            logger.info("Found %s clips", len(clips))
 
         self.shots = []  # type: list[Shot]
 
+        # Resolve's API isn't safe to use off the main thread,
+        # so read everything we need from the clips here first.
         for clip in clips:
-            clip_name = clip.GetName()
-            logger.info(f"Scanning {clip_name}")
-            self.window.Find("Status").SetText(f"Scanning {clip_name}")
+            logger.info("Scanning %s", clip.GetName())
+
+            # Generators, titles etc. don't have any source media to version up
+            mpItem = clip.GetMediaPoolItem()
+            if not mpItem:
+                continue
+
+            self.shots.append(Shot(clip, mpItem))
+
+        if not self.shots:
+            self.finish_scan()
+            return
+
+        # The same footage is often cut in more than once (or stacked on several tracks).
+        # Every cut still needs its own shot to update, but only one needs to search the disk.
+        toScan = {}
+        self._duplicateShots = {}
+        for shot in self.shots:
+            # Nothing to search for if there's no version in the path
+            if not shot.isVersionable:
+                continue
+
+            key = (shot.path, shot.duration)
+            if key in toScan:
+                self._duplicateShots[shot] = toScan[key]
+            else:
+                toScan[key] = shot
+
+        # Searching the disk for versions can be slow (especially over the network),
+        # so do it in the background and poll for results to keep the UI responsive.
+        self._failedShots = []
+        self._scanPending = self._scanTotal = len(toScan)
+        executor = ThreadPoolExecutor(max_workers=self.scanWorkers)
+        self._scanFutures = [
+            executor.submit(self.scan_shot, shot) for shot in toScan.values()
+        ]
+        executor.shutdown(wait=False)
+        self.scanTimer.Start()
+
+    def scan_shot(self, shot):
+        """Look on disk for a shot's versions.
+        This runs on a worker thread, so it must not touch the UI or Resolve."""
+        try:
+            shot.scan()
+            self._scanResults.put((shot, True))
+        except Exception:
+            logger.exception("Failed to scan versions for %s", shot.name)
+            self._scanResults.put((shot, False))
+
+    def poll_scan(self, event):
+        """Pick up any shots the background scan has finished with."""
+        lastShot = None
+        while True:
+            try:
+                lastShot, success = self._scanResults.get_nowait()
+            except Empty:
+                break
+
+            self._scanPending -= 1
+            if not success:
+                self._failedShots.append(lastShot)
+
+        # Only touch the label once per poll, however many shots came in
+        if lastShot:
+            done = self._scanTotal - self._scanPending
+            self.window.Find("Status").SetText(
+                f"Scanned {lastShot.name} ({done}/{self._scanTotal})"
+            )
+
+        if self._scanPending <= 0:
+            self.scanTimer.Stop()
+            self.finish_scan()
+
+    def finish_scan(self):
+        for shot, original in self._duplicateShots.items():
+            if original in self._failedShots:
+                self._failedShots.append(shot)
+            else:
+                shot.copyVersions(original)
 
-            with contextlib.suppress(AttributeError):
-                shot = Shot(clip)
-                self.shots.append(shot)
+        # Keep failed shots in the list so the user can see they were skipped,
+        # but leave them on the version they're already on
+        for shot in self._failedShots:
+            shot.scanFailed = True
+            shot.highestVersion = shot.currentVersion
 
         logger.debug("Building shot list..")
         self.build_shot_list()
 
-        bad = [i for i in self.shots if i.highestVersion != i.highestInvalidVersion]
+        bad = [
+            i
+            for i in self.shots
+            if i.isVersionable and i.highestVersion != i.highestInvalidVersion
+        ]
 
         if len(bad) > 0:
             self.alert(bad)
@@ -321,7 +686,16 @@ class VersionUpShotsWindow:
 
     def build_shot_list(self):
         tree = self.window.Find("ShotTree")
+
+        # Every row is a call into Resolve's UI. A rescan usually finds the same
+        # clips again, so update the rows we already have rather than rebuilding.
+        if self._rows and len(self._rows) == len(self.shots):
+            for row, shot in zip(self._rows, self.shots):
+                self.fill_row(row, shot)
+            return
+
         tree.Clear()
+        self._rows = []
 
         header = tree.NewItem()
         header.Text[0] = "Shot"
@@ -336,20 +710,30 @@ class VersionUpShotsWindow:
         tree.ColumnWidth[2] = 70
         tree.ColumnWidth[3] = 100
 
-        if self.shots:
-            for shot in self.shots:
-                row = tree.NewItem()
-                row.Text[0] = shot.name
-                row.Text[1] = Path(shot.currentVersion).name
-                row.Text[2] = (
-                    Path(shot.highestInvalidVersion).name
-                    if shot.highestInvalidVersion
-                    else ""
-                )
-                row.Text[3] = Path(shot.highestVersion).name
-                tree.AddTopLevelItem(row)
+        for shot in self.shots:
+            row = tree.NewItem()
+            self.fill_row(row, shot)
+            tree.AddTopLevelItem(row)
+            self._rows.append(row)
+
+    def fill_row(self, row, shot):
+        row.Text[0] = shot.name
+        if shot.scanFailed:
+            row.Text[0] = "!! SCAN FAILED !! " + shot.name
+        row.Text[1] = os.path.basename(shot.currentVersion)
+        row.Text[2] = (
+            os.path.basename(shot.highestInvalidVersion)
+            if shot.highestInvalidVersion
+            else ""
+        )
+        row.Text[3] = os.path.basename(shot.highestVersion)
 
     def closeEvent(self, event):
+        # Don't keep the script alive scanning shots nobody will see
+        for future in self._scanFutures:
+            future.cancel()
+        self.scanTimer.Stop()
+        self.updateTimer.Stop()
         DISPATCHER.ExitLoop()
 
 
@@ -359,86 +743,128 @@ class Shot:
     highestVersion = None
     highestInvalidVersion = None
     isVersionable = False
+    scanFailed = False
     path = None
     duration = None
     isSequence = False
     invalidVersions = None
+    clipProperties = None
 
-    def __init__(self, trackItem):  # type: (DaVinciResolveScript.TimelineItem) -> None
+    def __init__(
+        self, trackItem, mpItem
+    ):  # type: (DaVinciResolveScript.TimelineItem, DaVinciResolveScript.MediaPoolItem) -> None
         global VERSION_SCAN_REGEX
         self.name = trackItem.GetName()
-        logger.debug(f"Creating new shot object for {self.name}")
+        logger.debug("Creating new shot object for %s", self.name)
         self.trackItem = trackItem  # type: DaVinciResolveScript.TimelineItem
         self.duration = trackItem.GetDuration()
         self.invalidVersions = []
 
-        self.mpItem = (
-            trackItem.GetMediaPoolItem()
-        )  # type: DaVinciResolveScript.MediaPoolItem
-        self.path = self.mpItem.GetClipProperty("File Path")
+        self.mpItem = mpItem  # type: DaVinciResolveScript.MediaPoolItem
+        # Grab every property in one call, each call is a round trip to Resolve
+        self.clipProperties = self.mpItem.GetClipProperty()
+        self.path = self.clipProperties["File Path"]
 
-        logger.debug("Path: " + self.path)
+        logger.debug("Path: %s", self.path)
 
-        # restrict to unique entries. Proper version paths should be left with 1 unique version
-        version = list(set(VERSION_SCAN_REGEX.findall(self.path)))
+        # Proper version paths only have the one version, but if there's more
+        # than one, take the last so the result doesn't depend on set ordering
+        version = last_match(VERSION_SCAN_REGEX, self.path)
 
-        logger.debug(
-            f"Extracted version from clip: {VERSION_SCAN_REGEX.findall(self.path)}"
-        )
+        logger.debug("Extracted version from clip: %s", version)
 
-        if len(version) == 0:
+        if not version:
             self.isVersionable = False
             self.currentVersion = self.path
             self.highestVersion = self.path
             return
         self.isVersionable = True
-        self.currentVersion = version[-1]
+        self.currentVersion = version
+
+    def scan(self):
+        """Search the disk for the highest available version of this shot.
+        Only touches the filesystem, so this is safe to run off the main thread."""
+        if not self.isVersionable:
+            return
 
         available = self.availableVersions()
 
         self.highestVersion = available[-1]
 
+    def copyVersions(self, other):
+        """Take the scan results from another shot of the same footage."""
+        self.highestVersion = other.highestVersion
+        self.highestInvalidVersion = other.highestInvalidVersion
+        self.invalidVersions = other.invalidVersions
+        self.isSequence = other.isSequence
+
     def availableVersions(self):
         global versionRegex, frameSequenceRegex
 
-        version = list(set(VERSION_SCAN_REGEX.findall(self.path)))[-1]
+        version = self.currentVersion
         globPath = self.path.replace(version, "*")
 
-        frameRange = FRAME_SEQUENCE_REGEX.findall(globPath)
+        # Other cuts of the same footage will search in exactly the same way
+        cacheKey = (globPath, self.duration)
+        cached = _versions_cache.get(cacheKey)
+        if cached:
+            (
+                validResults,
+                self.invalidVersions,
+                self.highestInvalidVersion,
+                self.isSequence,
+            ) = cached
+            return list(validResults)
+
+        validResults = self.searchVersions(globPath)
+
+        # Being left on our own version (or on nothing) depends on which version
+        # this cut is on, so only share results other cuts could trust as well
+        if validResults and validResults != [version]:
+            _versions_cache[cacheKey] = (
+                validResults,
+                self.invalidVersions,
+                self.highestInvalidVersion,
+                self.isSequence,
+            )
+        return validResults
 
+    def searchVersions(self, globPath):
+        """Search the disk for every version matching the glob,
+        and validate them. Returns the valid versions."""
         logger.debug(
-            f"Scanning {self.name}.. version: {version}.\n\tGlob: {globPath}\n\tFrame Range: {frameRange}"
+            "Scanning %s.. version: %s.\n\tGlob: %s",
+            self.name,
+            self.currentVersion,
+            globPath,
         )
 
-        self.isSequence = isSequence = len(frameRange) > 0
+        self.isSequence = isSequence = FRAME_SEQUENCE_REGEX.search(globPath) is not None
         if isSequence:
             # If we have a sequence in a similarly named folder
             if len(globPath.split("*")) > 2:
                 # get rid of the file + extension so we run faster
-                globPath = re.sub(r"([^\\\/]+)$", "", globPath)
+                globPath = TRAILING_FILENAME_REGEX.sub("", globPath)
             else:
-                globPath = re.sub(FRAME_SEQUENCE_REGEX, "*", globPath)
-
-        logger.debug("Glob: " + globPath)
-        logger.debug("is sequence?" + str(isSequence))
-
-        results = sorted(
-            list(
-                set(
-                    [
-                        VERSION_SCAN_REGEX.findall(i)[-1]
-                        for i in sorted(glob.glob(globPath))
-                    ]
-                )
-            )
-        )
+                globPath = FRAME_SEQUENCE_REGEX.sub("*", globPath)
+
+        logger.debug("Glob: %s", globPath)
+        logger.debug("is sequence? %s", isSequence)
 
-        logger.debug("results:")
-        logger.debug(results)
+        results = list(list_versions(globPath))
+
+        logger.debug("results: %s", results)
+
+        # Already on the only version there is, nothing to validate
+        if len(results) == 1 and results[0] == self.currentVersion:
+            self.invalidVersions = []
+            self.highestInvalidVersion = results[-1]
+            return results
 
         validResults = self.validateVersions(results)
 
-        self.invalidVersions = [i for i in results if i not in validResults]
+        validSet = set(validResults)
+        self.invalidVersions = [i for i in results if i not in validSet]
 
         self.highestInvalidVersion = results[-1]
 
@@ -455,48 +881,55 @@ class Shot:
 
         for version in toScan:
             versionPath = self.path.replace(self.currentVersion, version)
-            sequence = FRAME_SEQUENCE_REGEX.findall(versionPath)[-1]
+            sequence = last_match(FRAME_SEQUENCE_REGEX, versionPath)
             globPath = versionPath.replace(sequence, "*")
 
-            files = glob.glob(globPath)
-            frames = sorted(
-                [
-                    i.replace(globPath.split("*")[0], "").replace(
-                        globPath.split("*")[1], ""
-                    )
-                    for i in files
-                ]
+            # Every frame lives in the same folder, so pull the frame numbers out
+            # of that folder's (cached) listing in a single regex pass.
+            directory, leaf = os.path.split(globPath)
+            if directory in _empty_dirs:
+                continue
+
+            prefix, suffix = leaf.split("*", 1)
+            framePattern = re.compile(
+                "^" + re.escape(prefix) + "([0-9]+)" + re.escape(suffix) + "$",
+                re.MULTILINE,
+            )
+            frames = list(
+                map(int, framePattern.findall(list_directory_text(directory)))
             )
 
-            if not self.missingFrames(frames) and len(frames) >= self.duration:
+            if len(frames) >= self.duration and not self.missingFrames(frames):
                 goodVersions.append(version)
                 break
 
         return goodVersions
 
     def missingFrames(self, frames):
+        """Check a list of frame numbers for gaps.
+        Frame numbers are unique, so the sequence is only complete
+        if the lowest and highest frames span exactly its length."""
         if len(frames) == 0:
             return True
-        start = int(frames[0])
-        i = start
-        for frame in frames:
-            if i == int(frame):
-                i += 1
-            else:
-                return True
-        return False
-
-    def update(self, importToSourceBin=False, swap_source=False):
-        ms = RESOLVE.GetMediaStorage()
+        return max(frames) - min(frames) + 1 != len(frames)
 
+    def newVersionPath(self):
+        """The path of this shot's highest version.
+        Sequences are imported by their folder, so that's what we return for them."""
+        newPath = self.path.replace(self.currentVersion, self.highestVersion)
+        if self.isSequence:
+            # Keep the folder's trailing separator, whichever way it's written
+            newPath = newPath[: len(newPath) - len(os.path.basename(newPath))]
+        return newPath
+
+    def update(self, swap_source=False, mediaPoolIndex=None):
+        """Swap in the highest version of this shot.
+        Unless we're swapping source footage, the new version should
+        already be imported into the media pool (and mediaPoolIndex)."""
         if self.currentVersion == self.highestVersion:
             return True
 
-        newPath = self.path.replace(self.currentVersion, self.highestVersion)
-        if self.isSequence:
-            newPath = newPath.replace(
-                re.findall(r"[\\\/]{1}([^\\\/]+)(?!.+)", newPath)[-1], ""
-            )
+        newPath = self.newVersionPath()
 
         if swap_source:
             if newPath.endswith("\\") or newPath.endswith("/"):
@@ -505,31 +938,26 @@ class Shot:
             self.mpItem.ReplaceClip(newPath)
             # check if the clip was replaced
             if newPath in self.mpItem.GetClipProperty("File Path"):
-                logger.info(f"Successfully updated {self.name} to {newPath}")
+                logger.info("Successfully updated %s to %s", self.name, newPath)
                 return True
             else:
-                logger.error(f"Failed to update {self.name} to {newPath}")
+                logger.error("Failed to update %s to %s", self.name, newPath)
                 return False
 
-        if importToSourceBin:
-            folder = self.findFolder(self.mpItem)
-            PROJECT.GetMediaPool().SetCurrentFolder(folder)
-
-        ms.AddItemListToMediaPool(newPath)
-
-        item = self.findItemInProject(newPath)
-
+        item = mediaPoolIndex.findClip(newPath)
         if not item:
-            logger.error(f"Could not find {newPath} in project!")
+            logger.error("Could not find %s in project!", newPath)
             return False
 
         self.swap(item)
 
-        if newPath in self.mpItem.GetClipProperty("File Path"):
-            logger.info(f"Successfully updated {self.name} to {newPath}")
+        # The timeline item should now be using the new version's media
+        swappedPath = self.trackItem.GetMediaPoolItem().GetClipProperty("File Path")
+        if newPath in swappedPath:
+            logger.info("Successfully updated %s to %s", self.name, newPath)
             return True
 
-        logger.error(f"Failed to update {self.name} to {newPath}")
+        logger.error("Failed to update %s to %s", self.name, newPath)
 
         return False
 
@@ -537,51 +965,13 @@ class Shot:
         timelineItem = self.trackItem
 
         leftOffset = timelineItem.GetLeftOffset()
-        start = int(timelineItem.GetMediaPoolItem().GetClipProperty("Start"))
+        start = int(self.clipProperties["Start"])
         newIn = start + leftOffset
 
         timelineItem.AddTake(mediaPoolItem, newIn, newIn + self.duration)
         timelineItem.SelectTakeByIndex(timelineItem.GetTakesCount())
         timelineItem.FinalizeTake()
 
-    def findItemInProject(self, path, folder=None):
-        global PROJECT
-        if not folder:
-            folder = PROJECT.GetMediaPool().GetRootFolder()
-
-        matches = [
-            i for i in folder.GetClipList() if path in i.GetClipProperty("File Path")
-        ]
-        if len(matches) > 0:
-            return matches[-1]
-
-        for subfolder in folder.GetSubFolderList():
-            result = self.findItemInProject(path, subfolder)
-            if result:
-                return result
-
-        return False
-
-    def findFolder(self, item, folder=None):
-        global PROJECT
-        if not folder:
-            folder = PROJECT.GetMediaPool().GetRootFolder()
-
-        matches = [
-            i
-            for i in folder.GetClipList()
-            if i.GetClipProperty() == item.GetClipProperty()
-        ]
-        if len(matches) > 0:
-            return folder
-
-        for subfolder in folder.GetSubFolderList():
-            result = self.findFolder(item, subfolder)
-            if result:
-                return result
-
-        return False
-
 
 # No `if __name__ == "__main__"` because this is a Resolve script,
 # resolve doesn't run as `__main__``  when launched from the Scripts menu